@@ -0,0 +1,28 @@
+"""Add voice pagination indexes
+
+Revision ID: 4f1d2a7c9b3e
+Revises: 89c2ca5d0b20
+Create Date: 2026-10-14 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1d2a7c9b3e'
+down_revision: Union[str, None] = '89c2ca5d0b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_sample_voices_created_at_voice_id', 'sample_voices', ['created_at', 'voice_id'], unique=False)
+    op.create_index('ix_sample_voices_user_id_created_at_voice_id', 'sample_voices', ['user_id', 'created_at', 'voice_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sample_voices_user_id_created_at_voice_id', table_name='sample_voices')
+    op.drop_index('ix_sample_voices_created_at_voice_id', table_name='sample_voices')
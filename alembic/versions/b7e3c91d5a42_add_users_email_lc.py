@@ -0,0 +1,28 @@
+"""Add generated lowercase email column to users
+
+Revision ID: b7e3c91d5a42
+Revises: 4f1d2a7c9b3e
+Create Date: 2026-10-14 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3c91d5a42'
+down_revision: Union[str, None] = '4f1d2a7c9b3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('email_lc', sa.String(length=255), sa.Computed('lower(email)', persisted=True), nullable=True))
+    op.create_index(op.f('ix_users_email_lc'), 'users', ['email_lc'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_email_lc'), table_name='users')
+    op.drop_column('users', 'email_lc')
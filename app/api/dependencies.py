@@ -2,18 +2,88 @@
 API dependencies for dependency injection.
 """
 
-from fastapi import UploadFile, HTTPException, Header, status
-from typing import Optional
-
+import threading
+import time
+from fastapi import UploadFile, HTTPException, Depends, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from typing import Optional, Tuple
+from cachetools import TTLCache
+
+from app.core.config import settings
 from app.core.exceptions import (
     ValidationError,
     InvalidAudioFileError,
-    AuthenticationError,
 )
 from app.utils.file_utils import validate_audio_file
-from app.services.auth_service import auth_service
+from app.services.auth_service import auth_service, token_cache_key
 from app.models.storage import UserRecord
 
+# Verified access tokens -> (user, token expiry). Keyed by SHA-256 of the token
+# so raw bearer tokens never sit in memory. Entries live at most
+# TOKEN_CACHE_TTL_SECONDS, which bounds how long a revoked user stays authorized.
+_token_cache: TTLCache[bytes, Tuple[UserRecord, float]] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS
+)
+_token_cache_lock = threading.Lock()
+
+# auto_error=False so a missing/malformed header yields our 401 instead of
+# HTTPBearer's default 403
+_bearer_scheme = HTTPBearer(auto_error=False)
+
+# Authentication failures are raised from shared instances so rejected requests
+# don't allocate a new exception and headers dict each time. Raise them with
+# .with_traceback(None) so tracebacks don't pile up on the shared object.
+_BEARER_HEADERS = {"WWW-Authenticate": "Bearer"}
+_ERR_MISSING = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Bearer authorization header missing or invalid",
+    headers=_BEARER_HEADERS,
+)
+_ERR_INVALID = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Invalid or expired token",
+    headers=_BEARER_HEADERS,
+)
+
+
+async def _resolve_user(token: str) -> Optional[UserRecord]:
+    """
+    Resolve the user for an access token, reusing recent verifications.
+
+    Only successful verifications are cached, so invalid tokens always
+    go through full verification.
+
+    Args:
+        token: JWT access token
+
+    Returns:
+        User record or None if invalid
+    """
+    key = token_cache_key(token)
+    now = time.time()
+
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+    if cached is not None:
+        user, expires_at = cached
+        if expires_at > now:
+            return user
+        with _token_cache_lock:
+            _token_cache.pop(key, None)
+
+    user = await auth_service.get_current_user(token)
+    if user is None:
+        return None
+
+    # Served from the auth service's verification cache, no second decode
+    payload = auth_service.verify_access_token(token)
+    expires_at = float(payload.get("exp", 0)) if payload else 0.0
+    if expires_at > now:
+        with _token_cache_lock:
+            _token_cache[key] = (user, expires_at)
+
+    return user
+
 
 async def validate_uploaded_file(file: UploadFile) -> UploadFile:
     """
@@ -32,18 +102,21 @@ async def validate_uploaded_file(file: UploadFile) -> UploadFile:
     if not file.filename:
         raise ValidationError("No file provided")
 
-    if not validate_audio_file(file.content_type or ""):
-        raise InvalidAudioFileError(file.content_type or "unknown")
+    content_type = file.content_type
+    if not content_type or not validate_audio_file(content_type):
+        raise InvalidAudioFileError(content_type or "unknown")
 
     return file
 
 
-async def get_current_user(authorization: Optional[str] = Header(None)) -> UserRecord:
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer_scheme),
+) -> UserRecord:
     """
     Get current authenticated user from Bearer token.
 
     Args:
-        authorization: Authorization header value
+        credentials: Bearer credentials parsed from the Authorization header
 
     Returns:
         User record
@@ -51,34 +124,11 @@ async def get_current_user(authorization: Optional[str] = Header(None)) -> UserR
     Raises:
         HTTPException: If authentication fails
     """
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authorization header missing",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication scheme",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authorization header format",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    user = auth_service.get_current_user(token)
+    if credentials is None:
+        raise _ERR_MISSING.with_traceback(None)
+
+    user = await _resolve_user(credentials.credentials)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _ERR_INVALID.with_traceback(None)
 
     return user
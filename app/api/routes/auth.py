@@ -3,7 +3,7 @@ Authentication routes for login and sign-up with Google OAuth.
 """
 
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from app.core.exceptions import AuthenticationError, ValidationError
 from app.models.schemas import (
@@ -20,7 +20,25 @@ from app.api.dependencies import get_current_user
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-@router.post("/google/token", response_model=TokenResponse)
+# Responses are built from our own DB records and freshly minted tokens, so
+# routes return them as ready ORJSONResponses: with response_model=None FastAPI
+# neither validates nor re-serializes them, and `responses` keeps the schemas
+# in the OpenAPI docs
+def _user_json(user: UserRecord) -> dict:
+    """UserResponse-shaped payload for a user record."""
+    return {
+        "id": user.user_id,
+        "email": user.email,
+        "name": user.name,
+        "picture": user.picture,
+        "provider": user.provider,
+        "created_at": user.created_at_iso,
+    }
+
+
+@router.post(
+    "/google/token", response_model=None, responses={200: {"model": TokenResponse}}
+)
 async def google_token_auth(request: GoogleAuthRequest):
     """
     Authenticate with Google ID token or Firebase ID token directly.
@@ -31,21 +49,16 @@ async def google_token_auth(request: GoogleAuthRequest):
     """
     try:
         # Authenticate with Google token or Firebase token
-        user, access_token = auth_service.authenticate_with_google_token(
+        user, access_token = await auth_service.authenticate_with_google_token(
             request.code, is_firebase_token=request.firebase_token or False
         )
 
-        return TokenResponse(
-            access_token=access_token,
-            token_type="bearer",
-            user={
-                "id": user.user_id,
-                "email": user.email,
-                "name": user.name,
-                "picture": user.picture,
-                "provider": user.provider,
-                "created_at": user.created_at.isoformat(),
-            },
+        return ORJSONResponse(
+            {
+                "access_token": access_token,
+                "token_type": "bearer",
+                "user": _user_json(user),
+            }
         )
     except AuthenticationError as e:
         raise HTTPException(status_code=401, detail=str(e))
@@ -55,7 +68,9 @@ async def google_token_auth(request: GoogleAuthRequest):
         raise HTTPException(status_code=500, detail=f"Authentication error: {str(e)}")
 
 
-@router.post("/verify", response_model=VerifyTokenResponse)
+@router.post(
+    "/verify", response_model=None, responses={200: {"model": VerifyTokenResponse}}
+)
 async def verify_id_token(request: IdTokenRequest):
     """
     Verify ID token (Firebase or Google), decode user info, and save to user table.
@@ -64,17 +79,15 @@ async def verify_id_token(request: IdTokenRequest):
     """
     try:
         # Verify token and get or create user
-        user = auth_service.verify_token_and_get_user(
+        user = await auth_service.verify_token_and_get_user(
             request.idToken, is_firebase_token=request.is_firebase_token or False
         )
 
         # Generate access and refresh tokens
-        access_token = auth_service.create_access_token(user)
-        refresh_token = auth_service.create_refresh_token(user)
+        access_token, refresh_token = auth_service.create_token_pair(user)
 
-        return VerifyTokenResponse(
-            access_token=access_token,
-            refresh_token=refresh_token,
+        return ORJSONResponse(
+            {"access_token": access_token, "refresh_token": refresh_token}
         )
     except AuthenticationError as e:
         raise HTTPException(status_code=401, detail=str(e))
@@ -84,17 +97,10 @@ async def verify_id_token(request: IdTokenRequest):
         raise HTTPException(status_code=500, detail=f"Error verifying token: {str(e)}")
 
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", response_model=None, responses={200: {"model": UserResponse}})
 async def get_current_user_info(user: UserRecord = Depends(get_current_user)):
     """
     Get current user information from access token.
     Token should be passed in Authorization header as: Bearer <token>
     """
-    return UserResponse(
-        id=user.user_id,
-        email=user.email,
-        name=user.name,
-        picture=user.picture,
-        provider=user.provider,
-        created_at=user.created_at,
-    )
+    return ORJSONResponse(_user_json(user))
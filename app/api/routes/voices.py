@@ -2,12 +2,13 @@
 Voice-related API routes.
 """
 
-from typing import Optional
-from fastapi import APIRouter, File, UploadFile, Form, Depends, status
-from fastapi.responses import StreamingResponse
-import io
+import threading
+from typing import AsyncIterator, Optional
+from cachetools import TTLCache
+from fastapi import APIRouter, File, UploadFile, Form, Depends, Response, status
 
 from app.models.schemas import (
+    AudioFormat,
     SynthesizeRequest,
     VoiceUploadResponse,
     VoiceMetadataResponse,
@@ -15,10 +16,46 @@ from app.models.schemas import (
 from app.api.dependencies import validate_uploaded_file, get_current_user
 from app.services.voice_service import voice_service
 from app.core.config import settings
+from app.core.exceptions import InvalidAudioFileError, ValidationError
 from app.models.storage import UserRecord
+from app.utils.file_utils import AUDIO_SIGNATURE_SIZE, has_audio_signature
 
 router = APIRouter(prefix="/voices", tags=["Voices"])
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+AUDIO_CONTENT_TYPES = {AudioFormat.WAV: "audio/wav", AudioFormat.MP3: "audio/mpeg"}
+
+# Voice metadata does not change after registration, so responses are cached
+# per voice_id. Nothing updates voices in place today; a future update/delete
+# path must pop the entry, otherwise readers see stale data for up to the TTL.
+# Missing voices raise before caching, so 404s are never cached.
+_metadata_cache: TTLCache[str, VoiceMetadataResponse] = TTLCache(maxsize=4096, ttl=300)
+_metadata_cache_lock = threading.Lock()
+
+
+async def _validated_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    """
+    Yield an upload in chunks, enforcing the audio signature and size limit.
+
+    Raises:
+        InvalidAudioFileError: If the content is not a recognised audio format
+        ValidationError: If the file is empty or larger than MAX_FILE_SIZE
+    """
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        # Sniff only the leading bytes of the first chunk, never the whole file
+        if size == 0 and not has_audio_signature(chunk[:AUDIO_SIGNATURE_SIZE]):
+            raise InvalidAudioFileError(file.content_type or "unknown")
+        size += len(chunk)
+        if size > settings.MAX_FILE_SIZE:
+            raise ValidationError(
+                f"File too large. Maximum size is {settings.MAX_FILE_SIZE} bytes"
+            )
+        yield chunk
+    if size == 0:
+        raise ValidationError("Uploaded file is empty")
+
 
 @router.post(
     "", response_model=VoiceUploadResponse, status_code=status.HTTP_201_CREATED
@@ -38,13 +75,11 @@ async def upload_voice_sample(
     - Stores metadata and returns voice_id
     - Associates the voice sample with the authenticated user
     """
-    # Read file content
-    file_content = await file.read()
-
-    # Register voice using service
+    # Chunks are validated and written to disk as they are read, so the
+    # upload is never buffered a second time
     record = await voice_service.register_voice(
         user_id=user.user_id,
-        file_content=file_content,
+        file_obj=_validated_chunks(file),
         filename=file.filename,
         name=name,
         description=description,
@@ -63,8 +98,8 @@ async def synthesize_cloned_voice(voice_id: str, request: SynthesizeRequest):
     """
     Synthesize speech using a cloned voice.
 
+    - Validates text is non-empty and within MAX_SYNTHESIS_CHARS
     - Validates voice_id exists
-    - Validates text is non-empty
     - Synthesizes speech using the voice embedding
     - Returns audio bytes in the requested format
     """
@@ -76,15 +111,12 @@ async def synthesize_cloned_voice(voice_id: str, request: SynthesizeRequest):
         sample_rate=request.sample_rate,
     )
 
-    # Determine content type
-    content_type = "audio/wav" if request.format == "wav" else "audio/mpeg"
-
-    # Return audio as streaming response
-    return StreamingResponse(
-        io.BytesIO(audio_bytes),
-        media_type=content_type,
+    # Audio is already fully in memory, send it in a single response body
+    return Response(
+        content=audio_bytes,
+        media_type=AUDIO_CONTENT_TYPES[request.format],
         headers={
-            "Content-Disposition": f'attachment; filename="synthesized.{request.format}"'
+            "Content-Disposition": f'attachment; filename="synthesized.{request.format.value}"'
         },
     )
 
@@ -96,9 +128,14 @@ async def get_voice_metadata(voice_id: str):
 
     Returns voice information without the audio file.
     """
-    record = voice_service.get_voice(voice_id)
+    with _metadata_cache_lock:
+        cached = _metadata_cache.get(voice_id)
+    if cached is not None:
+        return cached
+
+    record = await voice_service.get_voice(voice_id)
 
-    return VoiceMetadataResponse(
+    response = VoiceMetadataResponse(
         voice_id=record.voice_id,
         filename=record.filename,
         created_at=record.created_at,
@@ -107,3 +144,7 @@ async def get_voice_metadata(voice_id: str):
         name=record.name,
         description=record.description,
     )
+    with _metadata_cache_lock:
+        _metadata_cache[voice_id] = response
+
+    return response
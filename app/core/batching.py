@@ -0,0 +1,128 @@
+"""
+Micro-batching of concurrent async calls.
+"""
+
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+Batch = List[Tuple[Any, asyncio.Future]]
+
+# Queued by aclose(); the collector hands off its current batch and exits
+_CLOSE = object()
+
+
+class MicroBatcher:
+    """
+    Coalesces items submitted concurrently into batches for one handler.
+
+    The first queued item opens a batch; everything else queued within
+    window_ms (up to max_size items) joins it. The handler receives the batch
+    as (item, future) pairs and must resolve every future; if it raises, the
+    futures it left unresolved fail with that exception. With
+    max_concurrency set, a batch is only started while fewer than that many
+    are running, and requests keep queueing meanwhile.
+
+    The collector starts on the running loop on first use. aclose() runs
+    everything submitted before it was called, so no caller is left waiting.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Batch], Awaitable[None]],
+        max_size: int,
+        window_ms: float,
+        max_concurrency: Optional[int] = None,
+    ):
+        self._handler = handler
+        self._max_size = max_size
+        self._window = window_ms / 1000
+        self._max_concurrency = max_concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def _ensure_started(self) -> asyncio.Queue:
+        """Start the collector task on the running loop on first use."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            if self._max_concurrency is not None:
+                self._slots = asyncio.Semaphore(self._max_concurrency)
+            # A fresh context keeps the collector (and the batches it starts)
+            # out of the request that happened to start it
+            self._worker = loop.create_task(
+                self._collect(self._queue, self._slots),
+                context=contextvars.Context(),
+            )
+        return self._queue
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for the result the handler sets for it."""
+        queue = self._ensure_started()
+        future = self._loop.create_future()
+        queue.put_nowait((item, future))
+        # The queued pair is now the only reference the batch needs
+        del item
+        return await future
+
+    async def _collect(
+        self, queue: asyncio.Queue, slots: Optional[asyncio.Semaphore]
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            entry = await queue.get()
+            if entry is _CLOSE:
+                return
+            batch = [entry]
+            if slots is not None:
+                await slots.acquire()
+            closing = False
+            deadline = loop.time() + self._window
+            while len(batch) < self._max_size:
+                if not queue.empty():
+                    entry = queue.get_nowait()
+                else:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if entry is _CLOSE:
+                    closing = True
+                    break
+                batch.append(entry)
+            task = loop.create_task(self._run(batch, slots))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            del batch, entry
+            if closing:
+                return
+
+    async def _run(self, batch: Batch, slots: Optional[asyncio.Semaphore]) -> None:
+        try:
+            await self._handler(batch)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            if slots is not None:
+                slots.release()
+
+    async def aclose(self) -> None:
+        """Run everything already submitted, then stop the collector."""
+        worker, queue = self._worker, self._queue
+        if worker is None:
+            return
+        # Later submissions start a fresh collector instead of joining this one
+        self._loop = self._queue = self._slots = self._worker = None
+        queue.put_nowait(_CLOSE)
+        await worker
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
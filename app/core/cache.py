@@ -0,0 +1,100 @@
+"""
+Shared cache for verified third-party ID token payloads.
+"""
+
+import hashlib
+import hmac
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+from cachetools import TTLCache
+
+from app.core.config import settings
+
+
+class IdTokenCache:
+    """
+    Cache of decoded Google/Firebase ID token payloads.
+
+    Entries live in Redis when REDIS_URL is configured, so every worker reuses
+    a verification done by any other; otherwise they are kept per process.
+    Keys are an HMAC of the token under SECRET_KEY, so stored keys cannot be
+    linked back to a token without the secret. Only successfully verified
+    tokens are ever stored.
+    """
+
+    def __init__(self, prefix: str):
+        self._prefix = prefix
+        self._hmac_key = settings.SECRET_KEY.encode()
+        self._redis = None
+        self._local: TTLCache[str, Tuple[Dict[str, Any], float]] = TTLCache(
+            maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+            ttl=settings.ID_TOKEN_CACHE_TTL_SECONDS,
+        )
+        self._local_lock = threading.Lock()
+
+    def _client(self):
+        """Redis client, created on first use if REDIS_URL is set."""
+        if self._redis is None and settings.REDIS_URL:
+            import redis
+
+            self._redis = redis.Redis.from_url(settings.REDIS_URL)
+        return self._redis
+
+    def _key(self, token: str) -> str:
+        digest = hmac.new(self._hmac_key, token.encode(), hashlib.sha256)
+        return self._prefix + digest.hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached payload for a token.
+
+        Args:
+            token: Raw ID token
+
+        Returns:
+            Decoded payload, or None if the token has not been verified recently
+        """
+        key = self._key(token)
+        client = self._client()
+        if client is not None:
+            try:
+                cached = client.get(key)
+            except Exception:
+                # An unavailable cache only costs a fresh verification
+                return None
+            return orjson.loads(cached) if cached is not None else None
+
+        with self._local_lock:
+            entry = self._local.get(key)
+        if entry is not None and entry[1] > time.time():
+            return entry[0]
+        return None
+
+    def set(self, token: str, payload: Dict[str, Any], expires_at: float) -> None:
+        """
+        Cache a verified payload until the token expires, capped by
+        ID_TOKEN_CACHE_TTL_SECONDS.
+
+        Args:
+            token: Raw ID token
+            payload: Decoded payload to cache
+            expires_at: Token expiry as a Unix timestamp
+        """
+        ttl = int(min(expires_at - time.time(), settings.ID_TOKEN_CACHE_TTL_SECONDS))
+        if ttl <= 0:
+            return
+
+        key = self._key(token)
+        client = self._client()
+        if client is not None:
+            try:
+                client.setex(key, ttl, orjson.dumps(payload))
+            except Exception:
+                pass
+            return
+
+        with self._local_lock:
+            self._local[key] = (payload, time.time() + ttl)
@@ -0,0 +1,33 @@
+"""
+Cheap UTC clock for timestamp defaults.
+"""
+
+import time
+from datetime import datetime, timezone
+
+# Refresh the cached timestamp at most once per millisecond
+_RESOLUTION_NS = 1_000_000
+
+_last_ns = 0
+_last_dt = datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def utcnow() -> datetime:
+    """
+    Get the current UTC time as a naive datetime, with millisecond resolution.
+
+    Replaces the deprecated datetime.utcnow(). The value is naive to match the
+    timezone-less DateTime columns. Calls within the same millisecond reuse one
+    datetime object instead of allocating a new one each time.
+
+    Returns:
+        Current UTC time without tzinfo
+    """
+    global _last_ns, _last_dt
+    now_ns = time.time_ns()
+    if now_ns - _last_ns >= _RESOLUTION_NS:
+        _last_dt = datetime.fromtimestamp(now_ns / 1e9, timezone.utc).replace(
+            tzinfo=None
+        )
+        _last_ns = now_ns
+    return _last_dt
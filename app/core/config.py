@@ -3,6 +3,7 @@ Application configuration settings.
 """
 
 import os
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import List
 from pydantic import ConfigDict
@@ -22,7 +23,8 @@ class Settings(BaseSettings):
     PORT: int = 8000
 
     # CORS Settings
-    CORS_ORIGINS: List[str] = ["*"]  # In production, specify exact origins
+    # Comma-separated origins, e.g. "https://app.example.com,https://admin.example.com"
+    CORS_ORIGINS: str = "*"  # In production, specify exact origins
     CORS_ALLOW_CREDENTIALS: bool = True
     CORS_ALLOW_METHODS: List[str] = ["*"]
     CORS_ALLOW_HEADERS: List[str] = ["*"]
@@ -35,12 +37,38 @@ class Settings(BaseSettings):
     DEFAULT_SAMPLE_RATE: int = 22050
     DEFAULT_FORMAT: str = "wav"
     MAX_FILE_SIZE: int = 100 * 1024 * 1024  # 100MB
+    # Concurrent synthesis jobs; size to the number of model replicas/GPUs
+    SYNTHESIS_WORKERS: int = 1
+    # Requests arriving within the window are synthesized as one model batch
+    SYNTHESIS_BATCH_SIZE: int = 8
+    SYNTHESIS_BATCH_WINDOW_MS: int = 20
+    # Longer synthesis requests are rejected before any model work
+    MAX_SYNTHESIS_CHARS: int = 2000
+    # Embeddings of just-registered voices are kept in memory for this long so
+    # the first synthesis calls skip the encoder and the embedding file
+    RECENT_EMBEDDING_TTL_SECONDS: int = 600
+    RECENT_EMBEDDING_CACHE_SIZE: int = 256
 
     # Authentication Settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
-    ALGORITHM: str = "HS256"
+    # HS256 signs with SECRET_KEY. Asymmetric algorithms (EdDSA is the fastest
+    # to verify, ES256 and RS256 also work) sign with JWT_PRIVATE_KEY and verify
+    # with JWT_PUBLIC_KEY, which is derived from the private key when unset.
+    ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
+    JWT_PRIVATE_KEY: str = os.getenv("JWT_PRIVATE_KEY", "")
+    JWT_PUBLIC_KEY: str = os.getenv("JWT_PUBLIC_KEY", "")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Upper bound on how long a verified access token is trusted without re-verification
+    TOKEN_CACHE_TTL_SECONDS: int = 30
+    TOKEN_CACHE_MAX_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
+    # Upper bound on how long a verified Google/Firebase ID token is reused
+    ID_TOKEN_CACHE_TTL_SECONDS: int = 300
+    # Optional Redis shared by all workers for verified ID tokens, e.g.
+    # "redis://localhost:6379/0"; without it each process caches on its own
+    REDIS_URL: str = os.getenv("REDIS_URL", "")
 
     # Google OAuth Settings (for non-Firebase Google token verification)
     GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID", "")
@@ -59,17 +87,48 @@ class Settings(BaseSettings):
         "DATABASE_URL",
         f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:5432/{POSTGRES_DB}",
     )
+    # The application talks to Postgres through asyncpg; DATABASE_URL stays a
+    # plain postgresql:// URL so Alembic keeps using the sync psycopg2 driver
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 30
+    # Voice inserts issued within the window share one INSERT and commit
+    VOICE_WRITE_BATCH_SIZE: int = 64
+    VOICE_WRITE_BATCH_WINDOW_MS: int = 5
 
     model_config = ConfigDict(
         env_file=".env",
         case_sensitive=True,
         extra="ignore",  # Ignore extra environment variables
+        frozen=True,
     )
 
+    @cached_property
+    def async_database_url(self) -> str:
+        """DATABASE_URL with the asyncpg driver, used by the application engine."""
+        scheme, _, rest = self.DATABASE_URL.partition("://")
+        return f"{scheme.split('+')[0]}+asyncpg://{rest}"
 
-# Global settings instance
-settings = Settings()
+    @cached_property
+    def cors_origin_set(self) -> frozenset[str]:
+        """Allowed CORS origins parsed from CORS_ORIGINS."""
+        return frozenset(
+            origin.strip() for origin in self.CORS_ORIGINS.split(",") if origin.strip()
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings, parsed from the environment once per process.
+
+    Modules read the shared module-level `settings` instance created from it
+    at import time, so changed settings only take effect in a new process.
 
-# Ensure directories exist
-settings.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-settings.EMBEDDING_DIR.mkdir(parents=True, exist_ok=True)
+    Returns:
+        Settings instance
+    """
+    return Settings()
+
+
+# Global settings instance
+settings = get_settings()
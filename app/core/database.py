@@ -2,35 +2,81 @@
 Database connection and session management.
 """
 
-from sqlalchemy import create_engine
+import asyncio
+from contextvars import ContextVar
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_scoped_session,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Optional
 
 from app.core.config import settings
 
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
+engine = create_async_engine(
+    settings.async_database_url,
     pool_pre_ping=True,  # Verify connections before using
-    pool_size=10,
-    max_overflow=20,
+    pool_use_lifo=True,  # Hand out the most recently used (warm) connection first
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factory. Committed objects keep their loaded state, since
+# refreshing expired attributes would need implicit IO outside an await.
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
 
+# Marker for the request being handled; None outside of request handling
+_request_scope: ContextVar[Optional[object]] = ContextVar(
+    "db_request_scope", default=None
+)
+
+
+def _session_scope_key() -> object:
+    """Scope sessions per request, falling back to per-task for scripts."""
+    return _request_scope.get() or asyncio.current_task()
+
+
+# Session registry shared by the storage layer
+ScopedSession = async_scoped_session(SessionLocal, scopefunc=_session_scope_key)
 
-def get_db() -> Generator[Session, None, None]:
+
+def in_request_scope() -> bool:
+    """
+    Check whether the current code runs inside a request session scope.
+
+    Returns:
+        True if sessions are owned by request_session_scope
+    """
+    return _request_scope.get() is not None
+
+
+async def request_session_scope() -> AsyncGenerator[None, None]:
+    """
+    Dependency that shares one database session across a request.
+
+    Storage calls made while handling the request reuse the same session
+    instead of creating one per call. Each call still returns its connection
+    to the pool when it finishes (see with_session), so slow uploads and
+    synthesis do not keep a connection checked out. The session is discarded
+    once the request is done.
+    """
+    _request_scope.set(object())
+    try:
+        yield
+    finally:
+        await ScopedSession.remove()
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency function to get database session.
     Yields a database session and ensures it's closed after use.
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
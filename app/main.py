@@ -2,13 +2,45 @@
 FastAPI application entry point.
 """
 
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request, HTTPException
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.types import Receive, Scope, Send
 
 from app.core.config import settings
+from app.core.database import request_session_scope
 from app.models.schemas import ErrorResponse
 from app.api.routes import health, voices, auth
+from app.models.storage import storage
+from app.services.engine import shutdown_synthesis
+from app.utils.file_utils import remove_stale_uploads
+
+# Paths served without CORS processing (liveness/readiness probes)
+CORS_EXEMPT_PATHS = frozenset({"/health"})
+
+
+class ProbeAwareCORSMiddleware(CORSMiddleware):
+    """CORS middleware that lets probe endpoints bypass CORS handling."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in CORS_EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare storage directories once at startup and stop background work on exit."""
+    settings.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    settings.EMBEDDING_DIR.mkdir(parents=True, exist_ok=True)
+    remove_stale_uploads(settings.UPLOAD_DIR)
+    remove_stale_uploads(settings.EMBEDDING_DIR)
+    yield
+    await shutdown_synthesis()
+    await storage.flush()
 
 
 def create_app() -> FastAPI:
@@ -22,16 +54,15 @@ def create_app() -> FastAPI:
         title=settings.API_TITLE,
         description=settings.API_DESCRIPTION,
         version=settings.API_VERSION,
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+        dependencies=[Depends(request_session_scope)],
     )
 
     # CORS middleware
-    cors_origins = settings.CORS_ORIGINS
-    if isinstance(cors_origins, str):
-        cors_origins = [cors_origins] if cors_origins != "*" else ["*"]
-
     app.add_middleware(
-        CORSMiddleware,
-        allow_origins=cors_origins,
+        ProbeAwareCORSMiddleware,
+        allow_origins=list(settings.cors_origin_set),
         allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
         allow_methods=settings.CORS_ALLOW_METHODS,
         allow_headers=settings.CORS_ALLOW_HEADERS,
@@ -46,7 +77,7 @@ def create_app() -> FastAPI:
     @app.exception_handler(HTTPException)
     async def http_exception_handler(request: Request, exc: HTTPException):
         """Custom exception handler for consistent error responses."""
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
             content=ErrorResponse(
                 error=exc.detail or "An error occurred",
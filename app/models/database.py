@@ -2,12 +2,22 @@
 SQLAlchemy database models.
 """
 
-from datetime import datetime
-from sqlalchemy import Column, String, Float, Integer, DateTime, Text, ForeignKey
+from sqlalchemy import (
+    Column,
+    Computed,
+    String,
+    Float,
+    Integer,
+    DateTime,
+    Text,
+    ForeignKey,
+    Index,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
+from app.core.clock import utcnow
 from app.core.database import Base
 
 
@@ -23,11 +33,26 @@ class User(Base):
 
     user_id = Column(UUID(as_uuid=False), primary_key=True, default=generate_uuid)
     email = Column(String(255), unique=True, nullable=False, index=True)
+    # Normalized lookup key maintained by the database, so login lookups hit a
+    # plain unique index instead of lowering emails in every query
+    email_lc = Column(
+        String(255), Computed("lower(email)", persisted=True), unique=True, index=True
+    )
     name = Column(String(255), nullable=True)
     picture = Column(Text, nullable=True)
     provider = Column(String(50), default="google", nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+
+    # Voices are removed by the ON DELETE CASCADE foreign key, so deleting a
+    # user never needs to load them
+    sample_voices = relationship(
+        "SampleVoice",
+        back_populates="user",
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
     def __repr__(self):
         return f"<User(user_id={self.user_id}, email={self.email})>"
@@ -37,6 +62,16 @@ class SampleVoice(Base):
     """SampleVoice model for database with foreign key to User."""
 
     __tablename__ = "sample_voices"
+    __table_args__ = (
+        # Keyset pagination indexes for newest-first voice listings
+        Index("ix_sample_voices_created_at_voice_id", "created_at", "voice_id"),
+        Index(
+            "ix_sample_voices_user_id_created_at_voice_id",
+            "user_id",
+            "created_at",
+            "voice_id",
+        ),
+    )
 
     voice_id = Column(UUID(as_uuid=False), primary_key=True, default=generate_uuid)
     user_id = Column(
@@ -52,11 +87,13 @@ class SampleVoice(Base):
     sample_rate = Column(Integer, nullable=True)
     name = Column(String(255), nullable=True)
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
 
-    # Relationship to User
-    user = relationship("User", backref="sample_voices")
+    # Relationships never lazy-load: a stray attribute access in a loop would
+    # issue one SELECT per row, so it raises instead. Callers that need the
+    # related rows load them explicitly, e.g. options(selectinload(...)).
+    user = relationship("User", back_populates="sample_voices", lazy="raise")
 
     def __repr__(self):
         return f"<SampleVoice(voice_id={self.voice_id}, user_id={self.user_id}, filename={self.filename})>"
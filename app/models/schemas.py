@@ -3,16 +3,26 @@ Pydantic models for request/response validation.
 """
 
 from datetime import datetime
+from enum import Enum
 from typing import Optional
 from pydantic import BaseModel, Field
 
 
+class AudioFormat(str, Enum):
+    """Supported synthesis output formats."""
+
+    WAV = "wav"
+    MP3 = "mp3"
+
+
 class SynthesizeRequest(BaseModel):
     """Request model for speech synthesis."""
 
+    # The MAX_SYNTHESIS_CHARS limit is enforced on the stripped text by
+    # VoiceService.synthesize, before any model work
     text: str = Field(..., min_length=1, description="Text to synthesize")
-    format: str = Field(
-        default="wav", pattern="^(wav|mp3)$", description="Output audio format"
+    format: AudioFormat = Field(
+        default=AudioFormat.WAV, description="Output audio format"
     )
     sample_rate: int = Field(
         default=22050, ge=8000, le=48000, description="Sample rate in Hz"
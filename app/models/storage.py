@@ -2,19 +2,116 @@
 Storage layer for voice metadata and embeddings using SQLAlchemy with PostgreSQL.
 """
 
+import functools
+import threading
 from datetime import datetime
-from typing import Optional
-from uuid import uuid4
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-
-from app.core.database import SessionLocal
-from app.models.database import User as UserModel, SampleVoice as SampleVoiceModel
+from typing import Optional, Tuple
+from cachetools import TTLCache
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    bindparam,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.batching import MicroBatcher
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.core.database import ScopedSession, in_request_scope
+from app.models.database import (
+    User as UserModel,
+    SampleVoice as SampleVoiceModel,
+    generate_uuid,
+)
+
+__all__ = [
+    "DEFAULT_PAGE_SIZE",
+    "VoiceRecord",
+    "VoiceStorage",
+    "UserRecord",
+    "UserStorage",
+    "storage",
+    "user_storage",
+]
+
+# Hot lookups are built once with bound parameters so every call maps to the
+# same cached compiled statement instead of building a new Query each time
+_VOICE_BY_ID = select(SampleVoiceModel).where(
+    SampleVoiceModel.voice_id == bindparam("voice_id")
+)
+_USER_BY_ID = select(UserModel).where(UserModel.user_id == bindparam("user_id"))
+_USER_BY_EMAIL = select(UserModel).where(UserModel.email_lc == bindparam("email_lc"))
+
+# List queries project plain columns in VoiceRecord argument order, so rows
+# become records directly without hydrating ORM instances first
+_VOICE_RECORD_COLUMNS = select(
+    SampleVoiceModel.voice_id,
+    SampleVoiceModel.filename,
+    SampleVoiceModel.file_path,
+    SampleVoiceModel.embedding_path,
+    SampleVoiceModel.duration,
+    SampleVoiceModel.sample_rate,
+    SampleVoiceModel.name,
+    SampleVoiceModel.description,
+    SampleVoiceModel.created_at,
+)
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def _encode_cursor(record: "VoiceRecord") -> str:
+    """Encode the keyset position after a record as an opaque cursor."""
+    return f"{record.created_at.isoformat()}|{record.voice_id}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by _encode_cursor."""
+    try:
+        created_at, voice_id = cursor.split("|", 1)
+        return datetime.fromisoformat(created_at), voice_id
+    except ValueError:
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}")
+
+
+# Existence checks use SELECT EXISTS(...) so no row is loaded or hydrated
+_VOICE_EXISTS = select(
+    exists().where(SampleVoiceModel.voice_id == bindparam("voice_id"))
+)
+_USER_EXISTS = select(exists().where(UserModel.user_id == bindparam("user_id")))
+_USER_EXISTS_BY_EMAIL = select(
+    exists().where(UserModel.email_lc == bindparam("email_lc"))
+)
+
+# Writes that touch a single row return what they changed in the same round-trip
+_VOICE_DELETE = (
+    delete(SampleVoiceModel)
+    .where(SampleVoiceModel.voice_id == bindparam("voice_id"))
+    .returning(SampleVoiceModel.voice_id)
+)
 
 
 class VoiceRecord:
     """Represents a stored voice record (compatibility wrapper)."""
 
+    __slots__ = (
+        "voice_id",
+        "filename",
+        "file_path",
+        "embedding_path",
+        "duration",
+        "sample_rate",
+        "name",
+        "description",
+        "created_at",
+    )
+
     def __init__(
         self,
         voice_id: str,
@@ -35,7 +132,7 @@ class VoiceRecord:
         self.sample_rate = sample_rate
         self.name = name
         self.description = description
-        self.created_at = created_at or datetime.utcnow()
+        self.created_at = created_at or utcnow()
 
     @classmethod
     def from_model(cls, model: SampleVoiceModel) -> "VoiceRecord":
@@ -53,25 +150,55 @@ class VoiceRecord:
         )
 
 
+def with_session(method):
+    """
+    Decorator that runs a storage method with a database session.
+
+    The session is injected as the first argument after self: the storage's
+    own session if it was given one, otherwise the one shared across the
+    current request. Failed calls are rolled back. Shared sessions give their
+    connection back to the pool once the call returns, so a request never
+    holds one through uploads or model work between storage calls; sessions
+    opened outside a request are discarded as well.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        db = self._db or ScopedSession()
+        try:
+            return await method(self, db, *args, **kwargs)
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            if self._db is None:
+                if in_request_scope():
+                    # Ends the transaction and releases the connection; the
+                    # session itself stays registered for the next call
+                    await db.close()
+                else:
+                    await ScopedSession.remove()
+
+    return wrapper
+
+
 class VoiceStorage:
     """Database storage for voice records using SQLAlchemy."""
 
-    def __init__(self, db: Optional[Session] = None):
+    def __init__(self, db: Optional[AsyncSession] = None):
         self._db = db
+        # Rows queued within the window share one create_many() INSERT and
+        # commit; callers still wait until their own row is committed
+        self._write_batcher = MicroBatcher(
+            self._commit_batch,
+            max_size=settings.VOICE_WRITE_BATCH_SIZE,
+            window_ms=settings.VOICE_WRITE_BATCH_WINDOW_MS,
+        )
 
-    def _get_db(self) -> Session:
-        """Get database session."""
-        if self._db:
-            return self._db
-        return SessionLocal()
-
-    def _close_db(self, db: Session):
-        """Close database session if it was created by us."""
-        if not self._db:
-            db.close()
-
-    def create(
+    @with_session
+    async def create(
         self,
+        db: AsyncSession,
         user_id: str,
         filename: str,
         file_path: str,
@@ -82,102 +209,186 @@ class VoiceStorage:
         description: Optional[str] = None,
     ) -> VoiceRecord:
         """Create a new voice record."""
-        db = self._get_db()
-        try:
-            voice_model = SampleVoiceModel(
-                user_id=user_id,
-                filename=filename,
-                file_path=file_path,
-                embedding_path=embedding_path,
-                duration=duration,
-                sample_rate=sample_rate,
-                name=name,
-                description=description,
-            )
-            db.add(voice_model)
-            db.commit()
-            db.refresh(voice_model)
-            return VoiceRecord.from_model(voice_model)
-        except Exception:
-            db.rollback()
-            raise
-        finally:
-            self._close_db(db)
+        voice_model = SampleVoiceModel(
+            user_id=user_id,
+            filename=filename,
+            file_path=file_path,
+            embedding_path=embedding_path,
+            duration=duration,
+            sample_rate=sample_rate,
+            name=name,
+            description=description,
+        )
+        db.add(voice_model)
+        await db.commit()
+        await db.refresh(voice_model)
+        return VoiceRecord.from_model(voice_model)
+
+    @with_session
+    async def create_many(
+        self, db: AsyncSession, rows: list[dict]
+    ) -> list[VoiceRecord]:
+        """
+        Create several voice records in one bulk INSERT ... RETURNING.
+
+        Each row takes the same keyword arguments as create(). Records are
+        returned in the same order as rows.
+        """
+        if not rows:
+            return []
+        # Assign ids up front so results can be matched back to input order;
+        # RETURNING order is not guaranteed for multi-row inserts
+        rows = [{"voice_id": generate_uuid(), **row} for row in rows]
+        result = await db.scalars(
+            insert(SampleVoiceModel).returning(SampleVoiceModel), rows
+        )
+        voice_models = result.all()
+        await db.commit()
+        by_id = {str(model.voice_id): model for model in voice_models}
+        return [VoiceRecord.from_model(by_id[row["voice_id"]]) for row in rows]
 
-    def get(self, voice_id: str) -> Optional[VoiceRecord]:
+    @with_session
+    async def get(self, db: AsyncSession, voice_id: str) -> Optional[VoiceRecord]:
         """Get a voice record by ID."""
-        db = self._get_db()
-        try:
-            voice_model = (
-                db.query(SampleVoiceModel)
-                .filter(SampleVoiceModel.voice_id == voice_id)
-                .first()
-            )
-            if voice_model:
-                return VoiceRecord.from_model(voice_model)
-            return None
-        finally:
-            self._close_db(db)
+        voice_model = await db.scalar(_VOICE_BY_ID, {"voice_id": voice_id})
+        if voice_model:
+            return VoiceRecord.from_model(voice_model)
+        return None
 
-    def exists(self, voice_id: str) -> bool:
+    @with_session
+    async def exists(self, db: AsyncSession, voice_id: str) -> bool:
         """Check if a voice ID exists."""
-        db = self._get_db()
-        try:
-            return (
-                db.query(SampleVoiceModel)
-                .filter(SampleVoiceModel.voice_id == voice_id)
-                .first()
-                is not None
-            )
-        finally:
-            self._close_db(db)
+        return await db.scalar(_VOICE_EXISTS, {"voice_id": voice_id})
 
-    def delete(self, voice_id: str) -> bool:
+    @with_session
+    async def delete(self, db: AsyncSession, voice_id: str) -> bool:
         """Delete a voice record."""
-        db = self._get_db()
-        try:
-            voice_model = (
-                db.query(SampleVoiceModel)
-                .filter(SampleVoiceModel.voice_id == voice_id)
-                .first()
+        deleted = await db.scalar(_VOICE_DELETE, {"voice_id": voice_id})
+        await db.commit()
+        return deleted is not None
+
+    @with_session
+    async def _list_page(
+        self,
+        db: AsyncSession,
+        conditions: list,
+        limit: int,
+        cursor: Optional[str],
+    ) -> Tuple[list[VoiceRecord], Optional[str]]:
+        """Fetch one newest-first page of voice records using keyset pagination."""
+        stmt = _VOICE_RECORD_COLUMNS.where(*conditions)
+        if cursor:
+            created_at, voice_id = _decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(SampleVoiceModel.created_at, SampleVoiceModel.voice_id)
+                < tuple_(
+                    literal(created_at, SampleVoiceModel.created_at.type),
+                    literal(voice_id, SampleVoiceModel.voice_id.type),
+                )
             )
-            if voice_model:
-                db.delete(voice_model)
-                db.commit()
-                return True
-            return False
-        except Exception:
-            db.rollback()
-            raise
-        finally:
-            self._close_db(db)
+        # Fetch one extra row to know whether another page exists
+        stmt = stmt.order_by(
+            SampleVoiceModel.created_at.desc(), SampleVoiceModel.voice_id.desc()
+        ).limit(limit + 1)
 
-    def list_all(self) -> list[VoiceRecord]:
-        """List all voice records."""
-        db = self._get_db()
-        try:
-            voice_models = db.query(SampleVoiceModel).all()
-            return [VoiceRecord.from_model(model) for model in voice_models]
-        finally:
-            self._close_db(db)
+        result = await db.execute(stmt)
+        records = [VoiceRecord(*row) for row in result]
+
+        if len(records) > limit:
+            records = records[:limit]
+            return records, _encode_cursor(records[-1])
+        return records, None
+
+    async def create_batched(
+        self,
+        user_id: str,
+        filename: str,
+        file_path: str,
+        embedding_path: Optional[str] = None,
+        duration: Optional[float] = None,
+        sample_rate: Optional[int] = None,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> VoiceRecord:
+        """
+        Create a new voice record, sharing the INSERT and commit with
+        concurrent callers.
+
+        Takes the same arguments as create() and returns once the record is
+        committed; under bursts N registrations cost one round-trip and commit.
+        """
+        return await self._write_batcher.submit(
+            {
+                "user_id": user_id,
+                "filename": filename,
+                "file_path": file_path,
+                "embedding_path": embedding_path,
+                "duration": duration,
+                "sample_rate": sample_rate,
+                "name": name,
+                "description": description,
+            }
+        )
 
-    def list_by_user(self, user_id: str) -> list[VoiceRecord]:
-        """List all voice records for a specific user."""
-        db = self._get_db()
+    async def _commit_batch(self, batch: list) -> None:
+        """Write a batch of queued (row, future) pairs with one INSERT."""
         try:
-            voice_models = (
-                db.query(SampleVoiceModel)
-                .filter(SampleVoiceModel.user_id == user_id)
-                .all()
-            )
-            return [VoiceRecord.from_model(model) for model in voice_models]
-        finally:
-            self._close_db(db)
+            records = await self.create_many([row for row, _ in batch])
+        except Exception as e:
+            if len(batch) > 1:
+                # One bad row must not fail its neighbours: retry one by one
+                for item in batch:
+                    await self._commit_batch([item])
+            elif not batch[0][1].done():
+                batch[0][1].set_exception(e)
+            return
+        for (_, future), record in zip(batch, records):
+            if not future.done():
+                future.set_result(record)
+
+    async def flush(self) -> None:
+        """Commit queued batched writes; called on application shutdown."""
+        await self._write_batcher.aclose()
+
+    async def list_all(
+        self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+    ) -> Tuple[list[VoiceRecord], Optional[str]]:
+        """
+        List voice records, newest first, one page at a time.
+
+        Returns:
+            Tuple of (records, next_cursor); next_cursor is None on the last page
+        """
+        return await self._list_page([], limit, cursor)
+
+    async def list_by_user(
+        self, user_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+    ) -> Tuple[list[VoiceRecord], Optional[str]]:
+        """
+        List voice records for a specific user, newest first, one page at a time.
+
+        Returns:
+            Tuple of (records, next_cursor); next_cursor is None on the last page
+        """
+        return await self._list_page(
+            [SampleVoiceModel.user_id == user_id], limit, cursor
+        )
 
 
 class UserRecord:
     """Represents a stored user record (compatibility wrapper)."""
 
+    __slots__ = (
+        "user_id",
+        "email",
+        "email_lc",
+        "name",
+        "picture",
+        "provider",
+        "created_at",
+        "_created_at_iso",
+    )
+
     def __init__(
         self,
         user_id: str,
@@ -186,13 +397,23 @@ class UserRecord:
         picture: Optional[str] = None,
         provider: str = "google",
         created_at: Optional[datetime] = None,
+        email_lc: Optional[str] = None,
     ):
         self.user_id = user_id
         self.email = email
+        self.email_lc = email_lc or email.lower()
         self.name = name
         self.picture = picture
         self.provider = provider
-        self.created_at = created_at or datetime.utcnow()
+        self.created_at = created_at or utcnow()
+        self._created_at_iso: Optional[str] = None
+
+    @property
+    def created_at_iso(self) -> str:
+        """ISO 8601 form of created_at, computed once per record."""
+        if self._created_at_iso is None:
+            self._created_at_iso = self.created_at.isoformat()
+        return self._created_at_iso
 
     @classmethod
     def from_model(cls, model: UserModel) -> "UserRecord":
@@ -204,128 +425,178 @@ class UserRecord:
             picture=model.picture,
             provider=model.provider,
             created_at=model.created_at,
+            email_lc=model.email_lc,
         )
 
 
+# Process-local cache of user records by id and by (lowercased) email. Users
+# change rarely, and every write through UserStorage refreshes both entries;
+# writes from other processes become visible after USER_CACHE_TTL_SECONDS.
+_users_by_id: TTLCache[str, UserRecord] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+_users_by_email: TTLCache[str, UserRecord] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+_user_cache_lock = threading.Lock()
+
+
+def _cache_user(record: UserRecord) -> UserRecord:
+    """Store a freshly loaded or written user record in the user caches."""
+    with _user_cache_lock:
+        _users_by_id[record.user_id] = record
+        _users_by_email[record.email_lc] = record
+    return record
+
+
 class UserStorage:
     """Database storage for user records using SQLAlchemy."""
 
-    def __init__(self, db: Optional[Session] = None):
+    def __init__(self, db: Optional[AsyncSession] = None):
         self._db = db
 
-    def _get_db(self) -> Session:
-        """Get database session."""
-        if self._db:
-            return self._db
-        return SessionLocal()
-
-    def _close_db(self, db: Session):
-        """Close database session if it was created by us."""
-        if not self._db:
-            db.close()
-
-    def create(
+    @with_session
+    async def create(
         self,
+        db: AsyncSession,
         email: str,
         name: Optional[str] = None,
         picture: Optional[str] = None,
         provider: str = "google",
     ) -> UserRecord:
         """Create a new user record."""
-        db = self._get_db()
-        try:
-            user_model = UserModel(
-                email=email.lower(),
-                name=name,
-                picture=picture,
-                provider=provider,
-            )
-            db.add(user_model)
-            db.commit()
-            db.refresh(user_model)
-            return UserRecord.from_model(user_model)
-        except Exception:
-            db.rollback()
-            raise
-        finally:
-            self._close_db(db)
+        user_model = UserModel(
+            email=email,
+            name=name,
+            picture=picture,
+            provider=provider,
+        )
+        db.add(user_model)
+        await db.commit()
+        await db.refresh(user_model)
+        return _cache_user(UserRecord.from_model(user_model))
+
+    @with_session
+    async def _fetch(
+        self, db: AsyncSession, stmt, params: dict
+    ) -> Optional[UserRecord]:
+        """Load one user with a prebuilt lookup statement and cache it."""
+        user_model = await db.scalar(stmt, params)
+        if user_model:
+            return _cache_user(UserRecord.from_model(user_model))
+        return None
 
-    def get(self, user_id: str) -> Optional[UserRecord]:
+    async def get(self, user_id: str) -> Optional[UserRecord]:
         """Get a user record by ID."""
-        db = self._get_db()
-        try:
-            user_model = (
-                db.query(UserModel).filter(UserModel.user_id == user_id).first()
-            )
-            if user_model:
-                return UserRecord.from_model(user_model)
-            return None
-        finally:
-            self._close_db(db)
-
-    def get_by_email(self, email: str) -> Optional[UserRecord]:
-        """Get a user record by email."""
-        db = self._get_db()
-        try:
-            user_model = (
-                db.query(UserModel).filter(UserModel.email == email.lower()).first()
-            )
-            if user_model:
-                return UserRecord.from_model(user_model)
-            return None
-        finally:
-            self._close_db(db)
-
-    def exists(self, user_id: str) -> bool:
+        with _user_cache_lock:
+            cached = _users_by_id.get(user_id)
+        if cached is not None:
+            return cached
+        return await self._fetch(_USER_BY_ID, {"user_id": user_id})
+
+    async def get_by_email(self, email: str) -> Optional[UserRecord]:
+        """Get a user record by email (case-insensitive)."""
+        email_lc = email.lower()
+        with _user_cache_lock:
+            cached = _users_by_email.get(email_lc)
+        if cached is not None:
+            return cached
+        return await self._fetch(_USER_BY_EMAIL, {"email_lc": email_lc})
+
+    @with_session
+    async def exists(self, db: AsyncSession, user_id: str) -> bool:
         """Check if a user ID exists."""
-        db = self._get_db()
-        try:
-            return (
-                db.query(UserModel).filter(UserModel.user_id == user_id).first()
-                is not None
-            )
-        finally:
-            self._close_db(db)
+        return await db.scalar(_USER_EXISTS, {"user_id": user_id})
 
-    def exists_by_email(self, email: str) -> bool:
-        """Check if a user with this email exists."""
-        db = self._get_db()
-        try:
-            return (
-                db.query(UserModel).filter(UserModel.email == email.lower()).first()
-                is not None
+    @with_session
+    async def exists_by_email(self, db: AsyncSession, email: str) -> bool:
+        """Check if a user with this email exists (case-insensitive)."""
+        return await db.scalar(_USER_EXISTS_BY_EMAIL, {"email_lc": email.lower()})
+
+    @with_session
+    async def upsert(
+        self,
+        db: AsyncSession,
+        email: str,
+        name: Optional[str] = None,
+        picture: Optional[str] = None,
+        provider: str = "google",
+    ) -> UserRecord:
+        """
+        Create a user, or update name/picture of the existing user with this email.
+
+        Runs as a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING round-trip.
+        As with update(), None values keep the stored name/picture.
+        """
+        stmt = pg_insert(UserModel).values(
+            email=email,
+            name=name,
+            picture=picture,
+            provider=provider,
+        )
+        stmt = (
+            stmt.on_conflict_do_update(
+                index_elements=[UserModel.email_lc],
+                set_={
+                    "name": func.coalesce(stmt.excluded.name, UserModel.name),
+                    "picture": func.coalesce(stmt.excluded.picture, UserModel.picture),
+                    "updated_at": utcnow(),
+                },
             )
-        finally:
-            self._close_db(db)
+            .returning(UserModel)
+            .execution_options(populate_existing=True)
+        )
+        user_model = (await db.execute(stmt)).scalar_one()
+        await db.commit()
+        return _cache_user(UserRecord.from_model(user_model))
 
-    def update(
+    @with_session
+    async def update(
         self,
+        db: AsyncSession,
         user_id: str,
         name: Optional[str] = None,
         picture: Optional[str] = None,
     ) -> Optional[UserRecord]:
         """Update user information."""
-        db = self._get_db()
-        try:
-            user_model = (
-                db.query(UserModel).filter(UserModel.user_id == user_id).first()
+        values = {}
+        if name is not None:
+            values["name"] = name
+        if picture is not None:
+            values["picture"] = picture
+
+        if values:
+            stmt = (
+                update(UserModel)
+                .where(UserModel.user_id == user_id)
+                .values(**values)
+                .returning(UserModel)
+                .execution_options(populate_existing=True)
             )
-            if user_model:
-                if name is not None:
-                    user_model.name = name
-                if picture is not None:
-                    user_model.picture = picture
-                db.commit()
-                db.refresh(user_model)
-                return UserRecord.from_model(user_model)
-            return None
-        except Exception:
-            db.rollback()
-            raise
-        finally:
-            self._close_db(db)
-
-
-# Global storage instance
-storage = VoiceStorage()
-user_storage = UserStorage()
+            user_model = await db.scalar(stmt)
+            await db.commit()
+        else:
+            # Nothing to change: read the row without writing or bumping updated_at
+            user_model = await db.scalar(_USER_BY_ID, {"user_id": user_id})
+
+        if user_model:
+            return _cache_user(UserRecord.from_model(user_model))
+        return None
+
+
+# Global storage instances, created on first access (PEP 562) so importing
+# the records or storage classes alone does not build them
+_GLOBAL_STORAGE = {"storage": VoiceStorage, "user_storage": UserStorage}
+_global_storage_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    factory = _GLOBAL_STORAGE.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _global_storage_lock:
+        # Cached as a module global, so later lookups never reach this hook
+        instance = globals().get(name)
+        if instance is None:
+            instance = globals()[name] = factory()
+    return instance
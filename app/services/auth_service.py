@@ -2,28 +2,111 @@
 Authentication service for handling Google OAuth, Firebase Auth, and JWT tokens.
 """
 
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from google.oauth2 import id_token
-from google.auth.transport import requests
-from jose import JWTError, jwt
-import firebase_admin
-from firebase_admin import credentials, auth as firebase_auth
-
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Optional, Dict, Any, Tuple
+from cachetools import TTLCache
+import jwt
+
+from app.core.cache import IdTokenCache
 from app.core.config import settings
 from app.core.exceptions import AuthenticationError, ValidationError
 from app.models.storage import user_storage, UserRecord
 
 
+def token_cache_key(token: str) -> bytes:
+    """
+    Derive the in-memory cache key for a bearer token.
+
+    Caches are keyed by a digest so raw tokens are never held in memory.
+
+    Args:
+        token: Bearer token
+
+    Returns:
+        Digest bytes identifying the token
+    """
+    # OpenSSL's SHA-256 uses the CPU's SHA extensions where available; the
+    # flag only skips FIPS policy checks, the digest itself is unchanged
+    return hashlib.sha256(token.encode(), usedforsecurity=False).digest()
+
+
+def _load_jwt_keys() -> Tuple[Any, Any]:
+    """
+    Parse the JWT signing and verification keys once for the configured algorithm.
+
+    Returns:
+        Tuple of (signing_key, verification_key) ready to pass to PyJWT
+    """
+    algorithm = jwt.get_algorithm_by_name(settings.ALGORITHM)
+
+    if settings.ALGORITHM.startswith("HS"):
+        key = algorithm.prepare_key(settings.SECRET_KEY)
+        return key, key
+
+    if not settings.JWT_PRIVATE_KEY:
+        raise ValueError(
+            f"JWT_PRIVATE_KEY must be set to use the {settings.ALGORITHM} algorithm"
+        )
+
+    signing_key = algorithm.prepare_key(settings.JWT_PRIVATE_KEY.replace("\\n", "\n"))
+    if settings.JWT_PUBLIC_KEY:
+        verification_key = algorithm.prepare_key(
+            settings.JWT_PUBLIC_KEY.replace("\\n", "\n")
+        )
+    else:
+        verification_key = signing_key.public_key()
+
+    return signing_key, verification_key
+
+
 class AuthService:
     """Service for handling authentication operations."""
 
     def __init__(self):
-        self.google_request = requests.Request()
-        self._initialize_firebase()
+        # google-auth and firebase_admin are heavy imports only needed for
+        # sign-in, so they are loaded on first use rather than per worker start
+        self._google_request = None
+        self._firebase_checked = False
+        self._firebase_lock = threading.Lock()
+        self._signing_key, self._verification_key = _load_jwt_keys()
+        # Claims use integer Unix timestamps, so lifetimes are kept in seconds
+        self._access_token_lifetime = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        self._refresh_token_lifetime = settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+        # Decoded payloads of recently verified access tokens
+        self._payload_cache: TTLCache[bytes, Dict[str, Any]] = TTLCache(
+            maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+            ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+        )
+        self._payload_cache_lock = threading.Lock()
+        # Verified Google/Firebase ID tokens, so a token re-presented to any
+        # worker skips the remote cert lookup and signature check
+        self._firebase_token_cache = IdTokenCache("fbtok:")
+        self._google_token_cache = IdTokenCache("gtok:")
+
+    @property
+    def google_request(self):
+        """Transport request used to fetch Google's signing certs, created lazily."""
+        if self._google_request is None:
+            import cachecontrol
+            import requests as http_requests
+            from google.auth.transport import requests
+
+            # Google's signing certs are sent with Cache-Control max-age, so a
+            # caching keep-alive session turns per-login cert fetches into local
+            # hits (firebase_admin already does the same for Firebase tokens)
+            self._google_request = requests.Request(
+                session=cachecontrol.CacheControl(http_requests.Session())
+            )
+        return self._google_request
 
     def _initialize_firebase(self):
         """Initialize Firebase Admin SDK if credentials are provided."""
+        import firebase_admin
+        from firebase_admin import credentials
+
         if not firebase_admin._apps:
             import os
             import logging
@@ -124,6 +207,14 @@ class AuthService:
         Returns:
             True if Firebase is initialized, False otherwise
         """
+        import firebase_admin
+
+        # Initialization is attempted once, on first use
+        if not self._firebase_checked:
+            with self._firebase_lock:
+                if not self._firebase_checked:
+                    self._initialize_firebase()
+                    self._firebase_checked = True
         return bool(firebase_admin._apps)
 
     def verify_firebase_token(self, token: str) -> Dict[str, Any]:
@@ -146,6 +237,12 @@ class AuthService:
                 "FIREBASE_PROJECT_ID, or Firebase environment variables) to use Firebase token verification."
             )
 
+        cached = self._firebase_token_cache.get(token)
+        if cached is not None:
+            return cached
+
+        from firebase_admin import auth as firebase_auth
+
         try:
 
             # Verify the Firebase ID token
@@ -160,6 +257,7 @@ class AuthService:
                 "email_verified": decoded_token.get("email_verified", False),
             }
 
+            self._firebase_token_cache.set(token, user_info, decoded_token["exp"])
             return user_info
         except firebase_auth.InvalidIdTokenError as e:
             raise AuthenticationError(f"Invalid Firebase token: {str(e)}")
@@ -179,6 +277,12 @@ class AuthService:
         Raises:
             AuthenticationError: If token is invalid
         """
+        cached = self._google_token_cache.get(token)
+        if cached is not None:
+            return cached
+
+        from google.oauth2 import id_token
+
         try:
             # Verify the token
             idinfo = id_token.verify_oauth2_token(
@@ -192,6 +296,7 @@ class AuthService:
             ]:
                 raise AuthenticationError("Invalid token issuer")
 
+            self._google_token_cache.set(token, idinfo, idinfo["exp"])
             return idinfo
         except ValueError as e:
             raise AuthenticationError(f"Invalid Google token: {str(e)}")
@@ -208,18 +313,16 @@ class AuthService:
         Returns:
             JWT access token string
         """
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
+        now = int(time.time())
         to_encode = {
             "sub": user.user_id,
             "email": user.email,
-            "exp": expire,
-            "iat": datetime.utcnow(),
+            "exp": now + self._access_token_lifetime,
+            "iat": now,
             "type": "access",
         }
         encoded_jwt = jwt.encode(
-            to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+            to_encode, self._signing_key, algorithm=settings.ALGORITHM
         )
         return encoded_jwt
 
@@ -233,19 +336,59 @@ class AuthService:
         Returns:
             JWT refresh token string
         """
-        expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        now = int(time.time())
         to_encode = {
             "sub": user.user_id,
             "email": user.email,
-            "exp": expire,
-            "iat": datetime.utcnow(),
+            "exp": now + self._refresh_token_lifetime,
+            "iat": now,
             "type": "refresh",
         }
         encoded_jwt = jwt.encode(
-            to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+            to_encode, self._signing_key, algorithm=settings.ALGORITHM
         )
         return encoded_jwt
 
+    def create_token_pair(self, user: UserRecord) -> Tuple[str, str]:
+        """
+        Create access and refresh tokens for user in one pass.
+
+        Both tokens share the same base claims and issue time, so the claim
+        dict and timestamp are built once.
+
+        Args:
+            user: User record
+
+        Returns:
+            Tuple of (access_token, refresh_token)
+        """
+        now = int(time.time())
+        claims = {
+            "sub": user.user_id,
+            "email": user.email,
+            "iat": now,
+        }
+
+        access_token = jwt.encode(
+            {
+                **claims,
+                "exp": now + self._access_token_lifetime,
+                "type": "access",
+            },
+            self._signing_key,
+            algorithm=settings.ALGORITHM,
+        )
+        refresh_token = jwt.encode(
+            {
+                **claims,
+                "exp": now + self._refresh_token_lifetime,
+                "type": "refresh",
+            },
+            self._signing_key,
+            algorithm=settings.ALGORITHM,
+        )
+        return access_token, refresh_token
+
     def verify_access_token(self, token: str) -> Optional[Dict[str, Any]]:
         """
         Verify JWT access token.
@@ -256,15 +399,31 @@ class AuthService:
         Returns:
             Decoded token payload or None if invalid
         """
+        payload = self._cached_access_payload(token)
+        if payload is not None:
+            return payload
+
         try:
             payload = jwt.decode(
-                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+                token, self._verification_key, algorithms=[settings.ALGORITHM]
             )
-            return payload
-        except JWTError:
+        except jwt.PyJWTError:
             return None
 
-    def get_or_create_user_from_google(
+        with self._payload_cache_lock:
+            self._payload_cache[token_cache_key(token)] = payload
+        return payload
+
+    def _cached_access_payload(self, token: str) -> Optional[Dict[str, Any]]:
+        """Payload of a recently verified, still unexpired access token."""
+        with self._payload_cache_lock:
+            payload = self._payload_cache.get(token_cache_key(token))
+        # A cached payload is only reused while the token itself is unexpired
+        if payload is not None and payload.get("exp", 0) > time.time():
+            return payload
+        return None
+
+    async def get_or_create_user_from_google(
         self, google_user_info: Dict[str, Any]
     ) -> UserRecord:
         """
@@ -280,28 +439,15 @@ class AuthService:
         if not email:
             raise ValidationError("Email not provided in Google account")
 
-        # Check if user exists
-        user = user_storage.get_by_email(email)
-
-        if user:
-            # Update user info if needed
-            name = google_user_info.get("name")
-            picture = google_user_info.get("picture")
-            user_storage.update(user.user_id, name=name, picture=picture)
-            # Get updated user
-            user = user_storage.get(user.user_id)
-        else:
-            # Create new user
-            user = user_storage.create(
-                email=email,
-                name=google_user_info.get("name"),
-                picture=google_user_info.get("picture"),
-                provider="google",
-            )
-
-        return user
+        # Create or refresh the user in a single UPSERT round-trip
+        return await user_storage.upsert(
+            email=email,
+            name=google_user_info.get("name"),
+            picture=google_user_info.get("picture"),
+            provider="google",
+        )
 
-    def verify_token_and_get_user(
+    async def verify_token_and_get_user(
         self, token: str, is_firebase_token: bool = False
     ) -> UserRecord:
         """
@@ -325,7 +471,7 @@ class AuthService:
                     "Please configure Firebase credentials to use Firebase token verification, "
                     "or use Google OAuth token instead."
                 )
-            user_info = self.verify_firebase_token(token)
+            user_info = await asyncio.to_thread(self.verify_firebase_token, token)
             # Map Firebase user info to Google OAuth format
             google_user_info = {
                 "email": user_info.get("email"),
@@ -334,12 +480,12 @@ class AuthService:
                 "sub": user_info.get("sub"),
             }
         else:
-            google_user_info = self.verify_google_token(token)
+            google_user_info = await asyncio.to_thread(self.verify_google_token, token)
 
         # Get or create user
-        return self.get_or_create_user_from_google(google_user_info)
+        return await self.get_or_create_user_from_google(google_user_info)
 
-    def authenticate_with_google_token(
+    async def authenticate_with_google_token(
         self, google_token: str, is_firebase_token: bool = False
     ) -> tuple[UserRecord, str]:
         """
@@ -356,24 +502,30 @@ class AuthService:
             AuthenticationError: If authentication fails
         """
         # Verify token and get or create user
-        user = self.verify_token_and_get_user(google_token, is_firebase_token)
+        user = await self.verify_token_and_get_user(google_token, is_firebase_token)
 
         # Create access token
         access_token = self.create_access_token(user)
 
         return user, access_token
 
-    def get_current_user(self, token: str) -> Optional[UserRecord]:
+    async def get_current_user(self, token: str) -> Optional[UserRecord]:
         """
         Get current user from access token.
 
+        Recently verified tokens are answered from the payload cache; on a
+        miss the signature check runs in a worker thread, as it is CPU-bound
+        and would otherwise stall the event loop.
+
         Args:
             token: JWT access token
 
         Returns:
             User record or None if invalid
         """
-        payload = self.verify_access_token(token)
+        payload = self._cached_access_payload(token)
+        if payload is None:
+            payload = await asyncio.to_thread(self.verify_access_token, token)
         if payload is None:
             return None
 
@@ -381,7 +533,7 @@ class AuthService:
         if not user_id:
             return None
 
-        return user_storage.get(user_id)
+        return await user_storage.get(user_id)
 
 
 # Global auth service instance
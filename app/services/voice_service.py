@@ -2,19 +2,274 @@
 Voice service layer for business logic.
 """
 
+import asyncio
+import os
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
-import numpy as np
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterable,
+    Awaitable,
+    BinaryIO,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from cachetools import TTLCache
 
 from app.core.config import settings
 from app.core.exceptions import (
     EmbeddingComputationError,
     SynthesisError,
+    ValidationError,
     VoiceNotFoundError,
 )
+from app.models.schemas import AudioFormat
 from app.models.storage import storage, VoiceRecord
-from app.services.engine import compute_speaker_embedding, synthesize_speech
-from app.utils.file_utils import save_voice_file
+from app.services.engine import (
+    compute_speaker_embedding,
+    compute_speaker_embedding_batch,
+    synthesize_speech,
+)
+from app.utils.file_utils import (
+    asave_voice_file,
+    load_embedding,
+    publish_file,
+    save_embedding,
+    save_voice_file,
+    staging_path,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Embeddings computed by register_voice, keyed by voice_id. Clients usually
+# synthesize right after registering, so those calls skip both the encoder and
+# the embedding file; entries expire on their own to bound memory.
+_recent_embeddings: TTLCache[str, "np.ndarray"] = TTLCache(
+    maxsize=settings.RECENT_EMBEDDING_CACHE_SIZE,
+    ttl=settings.RECENT_EMBEDDING_TTL_SECONDS,
+)
+_recent_embeddings_lock = threading.Lock()
+
+
+@lru_cache(maxsize=128)
+def _load_embedding(embedding_path: str, mtime: float) -> "np.ndarray":
+    """
+    Load a stored speaker embedding, keeping recently used voices in memory.
+
+    The file's modification time is part of the cache key, so a rewritten
+    embedding is picked up on the next call.
+    """
+    return load_embedding(embedding_path)
+
+
+def _embedding_mtime(embedding_path: Optional[str]) -> Optional[float]:
+    """Modification time of a stored embedding, or None if there is none."""
+    if not embedding_path:
+        return None
+    try:
+        return os.path.getmtime(embedding_path)
+    except OSError:
+        return None
+
+
+def _stored_embedding(embedding_path: str) -> Optional["np.ndarray"]:
+    """Load a voice's stored embedding, or None if its file is missing."""
+    mtime = _embedding_mtime(embedding_path)
+    if mtime is None:
+        return None
+    return _load_embedding(embedding_path, mtime)
+
+
+def _remove_files(*paths: Optional[str]) -> None:
+    """Delete files left behind by a failed registration."""
+    for path in paths:
+        if path:
+            # missing_ok skips a separate exists() stat per file
+            Path(path).unlink(missing_ok=True)
+
+
+async def _stage_upload(
+    file_obj: Union[BinaryIO, AsyncIterable[bytes]], filename: str
+) -> Tuple[str, str]:
+    """
+    Stage an upload on disk without blocking the event loop.
+
+    Chunk streams are written as they arrive, file objects are copied in a
+    worker thread.
+
+    Returns:
+        Tuple of (staged temporary path, content-addressed path to publish at)
+    """
+    if hasattr(file_obj, "__aiter__"):
+        return await asave_voice_file(file_obj, filename, settings.UPLOAD_DIR)
+    return await _stage_in_thread(
+        save_voice_file, file_obj, filename, settings.UPLOAD_DIR
+    )
+
+
+async def _stage_in_thread(func, *args):
+    """
+    Run a function that stages a file in a worker thread.
+
+    A thread cannot be interrupted, so if the caller is cancelled the file it
+    stages is removed once it finishes instead of being left behind. func
+    returns the staged path, or a tuple starting with it.
+    """
+    future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        future.add_done_callback(_discard_staged)
+        raise
+
+
+def _discard_staged(future: asyncio.Future) -> None:
+    """Remove the file staged by an abandoned _stage_in_thread call."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    _remove_files(result[0] if isinstance(result, tuple) else result)
+
+
+async def _stage_uploads(
+    files: List[Tuple[Union[BinaryIO, AsyncIterable[bytes]], str]],
+) -> List[Tuple[str, str]]:
+    """
+    Stage several uploads concurrently, all or nothing.
+
+    If any upload fails, or the caller is cancelled, the others are stopped
+    and every file already staged is removed before the error propagates.
+
+    Returns:
+        (staged path, content-addressed path) per file, in order
+    """
+    tasks = [
+        asyncio.ensure_future(_stage_upload(file_obj, filename))
+        for file_obj, filename in files
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.wait(tasks)
+        await asyncio.to_thread(
+            _remove_files,
+            *(
+                task.result()[0]
+                for task in tasks
+                if not task.cancelled() and task.exception() is None
+            ),
+        )
+        raise
+    return [task.result() for task in tasks]
+
+
+def _embedding_path(file_path: str) -> str:
+    """Path the embedding of an uploaded file is stored at."""
+    return str(settings.EMBEDDING_DIR / f"{Path(file_path).stem}.npy")
+
+
+def _stage_embedding(embedding: "np.ndarray", embedding_path: str) -> str:
+    """Write an embedding to a staged file to be published at embedding_path."""
+    tmp_path = staging_path(embedding_path)
+    try:
+        save_embedding(embedding, tmp_path)
+    except BaseException:
+        _remove_files(tmp_path)
+        raise
+    return tmp_path
+
+
+def _publish_files(staged: List[Tuple[str, str]]) -> None:
+    """Publish (staged path, final path) pairs; leftovers are removed on failure."""
+    try:
+        for tmp_path, path in staged:
+            publish_file(tmp_path, path)
+    finally:
+        _remove_files(*(tmp_path for tmp_path, _ in staged))
+
+
+async def _publish_registered(
+    records: List[VoiceRecord], staged: List[Tuple[str, str]]
+) -> None:
+    """
+    Publish the staged files of committed voice records.
+
+    Uploads are content-addressed and shared between voices, so they only get
+    their final names once their records are committed: a failed
+    registration then just discards its own staged files and never deletes
+    a file another voice already points at. If publishing fails, the records
+    are deleted again so none is left pointing at a missing file.
+
+    Raises:
+        EmbeddingComputationError: If the files could not be published
+    """
+    try:
+        await asyncio.to_thread(_publish_files, staged)
+    except Exception as e:
+        for record in records:
+            await storage.delete(record.voice_id)
+        raise EmbeddingComputationError(str(e))
+
+
+# Commits whose callers were cancelled still finish publishing or cleaning up
+_pending_commits: Set[asyncio.Task] = set()
+
+_Committed = TypeVar("_Committed", VoiceRecord, List[VoiceRecord])
+
+
+async def _commit_registered(
+    commit: Awaitable[_Committed], staged: List[Tuple[str, str]]
+) -> _Committed:
+    """
+    Commit voice records, then publish their staged files.
+
+    Once the insert is submitted, a cancelled caller cannot know whether it
+    was committed, so the commit runs in its own task that always ends by
+    either publishing the staged files or removing them.
+
+    Args:
+        commit: Awaitable that stores one record or a list of them
+        staged: (staged path, final path) pairs of the records' files
+
+    Returns:
+        What commit returned
+
+    Raises:
+        EmbeddingComputationError: If storing or publishing fails
+    """
+
+    async def run() -> _Committed:
+        try:
+            result = await commit
+        except Exception as e:
+            await asyncio.to_thread(_remove_files, *(tmp for tmp, _ in staged))
+            raise EmbeddingComputationError(str(e))
+        records = result if isinstance(result, list) else [result]
+        await _publish_registered(records, staged)
+        return result
+
+    task = asyncio.ensure_future(run())
+    _pending_commits.add(task)
+    task.add_done_callback(_pending_commits.discard)
+    return await asyncio.shield(task)
+
+
+def _remember_embedding(voice_id: str, embedding: Optional["np.ndarray"]) -> None:
+    """Keep a freshly computed embedding in the recent-embedding cache."""
+    if embedding is None:
+        return
+    with _recent_embeddings_lock:
+        _recent_embeddings[voice_id] = embedding
 
 
 class VoiceService:
@@ -23,7 +278,7 @@ class VoiceService:
     @staticmethod
     async def register_voice(
         user_id: str,
-        file_content: bytes,
+        file_obj: Union[BinaryIO, AsyncIterable[bytes]],
         filename: str,
         name: Optional[str] = None,
         description: Optional[str] = None,
@@ -33,7 +288,8 @@ class VoiceService:
 
         Args:
             user_id: User ID who owns this voice sample
-            file_content: Audio file content as bytes
+            file_obj: Readable binary file positioned at the start of the audio,
+                or an async iterable of audio chunks
             filename: Original filename
             name: Optional name for the voice
             description: Optional description
@@ -44,26 +300,38 @@ class VoiceService:
         Raises:
             EmbeddingComputationError: If embedding computation fails
         """
-        # Save file to disk
-        file_path = save_voice_file(file_content, filename, settings.UPLOAD_DIR)
+        # Stage file on disk; it is published once its record is committed
+        tmp_path, file_path = await _stage_upload(file_obj, filename)
+        staged = [(tmp_path, file_path)]
 
         try:
             # Compute speaker embedding
-            embedding, duration, sample_rate = await compute_speaker_embedding(
-                file_path
-            )
+            embedding, duration, sample_rate = await compute_speaker_embedding(tmp_path)
 
-            # Save embedding path (optional - you may want to save it to disk)
+            # Stage the embedding
             embedding_path = None
             if embedding is not None:
-                embedding_path = str(
-                    settings.EMBEDDING_DIR / f"{Path(file_path).stem}.npy"
+                embedding_path = _embedding_path(file_path)
+                staged.append(
+                    (
+                        await _stage_in_thread(
+                            _stage_embedding, embedding, embedding_path
+                        ),
+                        embedding_path,
+                    )
                 )
-                # In production, save the embedding array
-                # np.save(embedding_path, embedding)
 
-            # Store metadata
-            record = storage.create(
+        except BaseException as e:
+            # Clean up staged files on error or cancellation; nothing was
+            # published yet
+            await asyncio.to_thread(_remove_files, *(tmp for tmp, _ in staged))
+            if isinstance(e, Exception):
+                raise EmbeddingComputationError(str(e))
+            raise
+
+        # Store metadata; concurrent registrations share one commit
+        record = await _commit_registered(
+            storage.create_batched(
                 user_id=user_id,
                 filename=filename,
                 file_path=file_path,
@@ -72,18 +340,92 @@ class VoiceService:
                 sample_rate=sample_rate,
                 name=name,
                 description=description,
-            )
+            ),
+            staged,
+        )
+        _remember_embedding(record.voice_id, embedding)
+        return record
+
+    @staticmethod
+    async def register_many(
+        user_id: str,
+        files: List[Tuple[Union[BinaryIO, AsyncIterable[bytes]], str]],
+    ) -> List[VoiceRecord]:
+        """
+        Register several voices at once, e.g. when onboarding a dataset.
+
+        Uploads are staged concurrently, the speaker encoder runs once over
+        the whole batch and all records are stored with a single INSERT. The
+        batch is all-or-nothing: if any file fails, the staged files are
+        removed and no records are stored.
 
-            return record
+        Args:
+            user_id: User ID who owns these voice samples
+            files: (file_obj, filename) pairs, as accepted by register_voice
+
+        Returns:
+            One VoiceRecord per file, in the same order
+
+        Raises:
+            EmbeddingComputationError: If saving or embedding any file fails
+        """
+        if not files:
+            return []
 
+        try:
+            staged = await _stage_uploads(files)
         except Exception as e:
-            # Clean up saved file on error
-            if Path(file_path).exists():
-                Path(file_path).unlink()
             raise EmbeddingComputationError(str(e))
 
+        try:
+            tmp_paths = [tmp_path for tmp_path, _ in staged]
+            file_paths = [file_path for _, file_path in staged]
+
+            # One encoder pass over the whole batch
+            results = await compute_speaker_embedding_batch(tmp_paths)
+
+            embedding_paths = [
+                _embedding_path(file_path) if embedding is not None else None
+                for file_path, (embedding, _, _) in zip(file_paths, results)
+            ]
+            for embedding_path, (embedding, _, _) in zip(embedding_paths, results):
+                if embedding_path is not None:
+                    tmp_path = await _stage_in_thread(
+                        _stage_embedding, embedding, embedding_path
+                    )
+                    staged.append((tmp_path, embedding_path))
+
+            rows = []
+            for (_, filename), file_path, embedding_path, result in zip(
+                files, file_paths, embedding_paths, results
+            ):
+                _, duration, sample_rate = result
+                rows.append(
+                    {
+                        "user_id": user_id,
+                        "filename": filename,
+                        "file_path": file_path,
+                        "embedding_path": embedding_path,
+                        "duration": duration,
+                        "sample_rate": sample_rate,
+                    }
+                )
+
+        except BaseException as e:
+            # Clean up staged files on error or cancellation; nothing was
+            # published yet
+            await asyncio.to_thread(_remove_files, *(tmp for tmp, _ in staged))
+            if isinstance(e, Exception):
+                raise EmbeddingComputationError(str(e))
+            raise
+
+        records = await _commit_registered(storage.create_many(rows), staged)
+        for record, (embedding, _, _) in zip(records, results):
+            _remember_embedding(record.voice_id, embedding)
+        return records
+
     @staticmethod
-    def get_voice(voice_id: str) -> VoiceRecord:
+    async def get_voice(voice_id: str) -> VoiceRecord:
         """
         Get a voice record by ID.
 
@@ -96,7 +438,7 @@ class VoiceService:
         Raises:
             VoiceNotFoundError: If voice not found
         """
-        record = storage.get(voice_id)
+        record = await storage.get(voice_id)
         if not record:
             raise VoiceNotFoundError(voice_id)
         return record
@@ -105,7 +447,7 @@ class VoiceService:
     async def synthesize(
         voice_id: str,
         text: str,
-        format: str = "wav",
+        format: AudioFormat = AudioFormat.WAV,
         sample_rate: int = 22050,
     ) -> bytes:
         """
@@ -122,30 +464,48 @@ class VoiceService:
 
         Raises:
             VoiceNotFoundError: If voice not found
+            ValidationError: If text is longer than MAX_SYNTHESIS_CHARS
             SynthesisError: If synthesis fails
         """
+        # Validate text before any lookup or model work
+        text = text.strip() if text else ""
+        if not text:
+            raise SynthesisError("Text cannot be empty")
+        if len(text) > settings.MAX_SYNTHESIS_CHARS:
+            raise ValidationError(
+                f"Text too long (max {settings.MAX_SYNTHESIS_CHARS} characters)"
+            )
+
         # Get voice record
-        record = storage.get(voice_id)
+        record = await storage.get(voice_id)
         if not record:
             raise VoiceNotFoundError(voice_id)
 
-        # Validate text
-        if not text or not text.strip():
-            raise SynthesisError("Text cannot be empty")
-
         try:
-            # Load embedding (in production, load from disk or database)
-            # For now, we'll need to recompute or load from the stored path
-            # This is a placeholder - implement based on your storage strategy
-            embedding, _, _ = await compute_speaker_embedding(record.file_path)
+            # Use the embedding computed at registration: from memory while the
+            # voice is fresh, then from its stored file; voices registered
+            # without one fall back to running the encoder
+            with _recent_embeddings_lock:
+                embedding = _recent_embeddings.get(voice_id)
+            if embedding is None and record.embedding_path:
+                # stat() and, on a miss, the load touch the disk
+                embedding = await asyncio.to_thread(
+                    _stored_embedding, record.embedding_path
+                )
+            if embedding is None:
+                embedding, _, _ = await compute_speaker_embedding(record.file_path)
 
-            # Synthesize speech
-            audio_bytes = await synthesize_speech(
+            # Synthesize speech; drop the local reference first so a freshly
+            # computed embedding is freed once its batch is done, not held
+            # for the rest of this request
+            synthesis = synthesize_speech(
                 embedding=embedding,
-                text=text.strip(),
+                text=text,
                 sample_rate=sample_rate,
                 format=format,
             )
+            del embedding
+            audio_bytes = await synthesis
 
             return audio_bytes
 
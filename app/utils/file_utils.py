@@ -1,36 +1,263 @@
 """
 File utility functions.
 """
+import hashlib
+import os
+import tempfile
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterable, BinaryIO, Tuple
 
+import aiofiles
+import aiofiles.os
+import aiofiles.tempfile
 
-def save_voice_file(file_content: bytes, filename: str, upload_dir: Path) -> str:
+if TYPE_CHECKING:
+    import numpy as np
+
+_AUDIO_MIME_TYPES: frozenset[str] = frozenset(
+    {
+        "audio/wav",
+        "audio/wave",
+        "audio/x-wav",
+        "audio/mpeg",
+        "audio/mp3",
+        "audio/mp4",
+        "audio/x-m4a",
+        "audio/m4a",
+        "audio/ogg",
+        "audio/webm",
+        "audio/flac",
+        "audio/x-flac",
+    }
+)
+
+# Bytes needed from the start of a file to recognise its container format
+AUDIO_SIGNATURE_SIZE = 16
+
+# Copy uploads to disk in large blocks: memory stays bounded per upload while
+# a typical sample is written in one or two syscalls
+FILE_COPY_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB
+
+# Staged files are named ".upload-*"; any older than this were left behind
+# by a crashed worker rather than belonging to a registration in progress
+UPLOAD_TEMP_PREFIX = ".upload-"
+STALE_UPLOAD_AGE_SECONDS = 60 * 60
+
+
+def _default_file_mode() -> int:
+    """Mode a plain open() would create files with under the process umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# Staged files are created 0600; published ones get the regular default so
+# other readers of the upload directories (model workers, nginx) can open them
+PUBLISHED_FILE_MODE = _default_file_mode()
+
+
+def save_voice_file(
+    file_obj: BinaryIO, filename: str, upload_dir: Path
+) -> Tuple[str, str]:
     """
-    Save uploaded voice file to disk.
+    Stage an uploaded voice file on disk under a private temporary name.
+    
+    The file is hashed while it is streamed, which yields the content-addressed
+    name "<sha256 prefix><suffix>" it is published under by publish_file once
+    its voice record is committed. Identical uploads map to the same path, so
+    a repeat upload reuses the stored file instead of a copy. Until then the
+    staged file is visible to no other registration, so a failed one only
+    has to delete its own temporary file.
     
     Args:
-        file_content: File content as bytes
-        filename: Original filename
+        file_obj: Readable binary file with the uploaded content, streamed
+            to disk in FILE_COPY_CHUNK_SIZE blocks
+        filename: Original filename (only its extension is kept)
         upload_dir: Directory to save files
         
     Returns:
-        Path to saved file
+        Tuple of (staged temporary path, content-addressed path to publish at)
     """
     upload_dir.mkdir(parents=True, exist_ok=True)
     
-    # Generate unique filename to avoid collisions
-    file_path = upload_dir / filename
+    suffix = Path(filename).suffix
+    hasher = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(
+        dir=upload_dir, prefix=UPLOAD_TEMP_PREFIX, suffix=suffix
+    )
+    try:
+        # Chunks larger than the write buffer are passed straight to the OS,
+        # and the buffered writer retries short writes that a raw file would drop
+        with open(fd, "wb") as dst:
+            while chunk := file_obj.read(FILE_COPY_CHUNK_SIZE):
+                hasher.update(chunk)
+                dst.write(chunk)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return tmp_path, _content_path(upload_dir, hasher.hexdigest(), suffix)
+
+
+async def asave_voice_file(
+    chunks: AsyncIterable[bytes], filename: str, upload_dir: Path
+) -> Tuple[str, str]:
+    """
+    Stage an upload streamed as chunks, without blocking the event loop.
+    
+    Async counterpart of save_voice_file: chunks are written as they arrive
+    through aiofiles, so no intermediate copy of the upload is buffered.
+    An exception raised by the chunk iterator aborts the save and leaves
+    nothing behind in upload_dir.
+    
+    Args:
+        chunks: Async iterable of upload content blocks
+        filename: Original filename (only its extension is kept)
+        upload_dir: Directory to save files
+        
+    Returns:
+        Tuple of (staged temporary path, content-addressed path to publish at)
+    """
+    await aiofiles.os.makedirs(upload_dir, exist_ok=True)
+    
+    suffix = Path(filename).suffix
+    hasher = hashlib.sha256()
+    async with aiofiles.tempfile.NamedTemporaryFile(
+        "wb", dir=upload_dir, prefix=UPLOAD_TEMP_PREFIX, suffix=suffix, delete=False
+    ) as dst:
+        tmp_path = dst.name
+        try:
+            async for chunk in chunks:
+                hasher.update(chunk)
+                await dst.write(chunk)
+        except BaseException:
+            await dst.close()
+            await aiofiles.os.remove(tmp_path)
+            raise
+    return tmp_path, _content_path(upload_dir, hasher.hexdigest(), suffix)
+
+
+def _content_path(upload_dir: Path, digest: str, suffix: str) -> str:
+    """Content-addressed path of an upload with the given sha256 digest."""
+    return str(upload_dir / f"{digest[:16]}{suffix}")
+
+
+def staging_path(path: str) -> str:
+    """
+    Create an empty private temporary file next to path, for publish_file.
+    
+    Args:
+        path: Final path the file will be published at
+        
+    Returns:
+        Path of the temporary file, with the same suffix as path
+    """
+    final = Path(path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=final.parent, prefix=UPLOAD_TEMP_PREFIX, suffix=final.suffix
+    )
+    os.close(fd)
+    return tmp_path
+
+
+def publish_file(tmp_path: str, path: str) -> bool:
+    """
+    Give a fully written staged file its final name, then remove the staged one.
+    
+    Used for content-addressed files, where an existing file at path already
+    has the same content and is kept as is.
+    
+    Args:
+        tmp_path: Staged temporary file
+        path: Final path
+        
+    Returns:
+        True if this call created path, False if it already existed
+    """
+    try:
+        os.chmod(tmp_path, PUBLISHED_FILE_MODE)
+        # Flush the data before it gets its final name, so a crash can never
+        # leave a truncated file that later uploads of the same content reuse
+        _fsync_path(tmp_path)
+        # Publishing with link() is an atomic create-if-absent, like O_EXCL:
+        # when concurrent uploads of the same content race, exactly one wins
+        # and no stat() probe is needed beforehand
+        try:
+            os.link(tmp_path, path)
+        except FileExistsError:
+            # Same content is already stored
+            return False
+        # Persist the new directory entry
+        _fsync_path(os.path.dirname(path))
+        return True
+    finally:
+        Path(tmp_path).unlink(missing_ok=True)
+
+
+def _fsync_path(path) -> None:
+    """Flush a file's or directory's contents to stable storage."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def remove_stale_uploads(
+    upload_dir: Path, max_age_seconds: float = STALE_UPLOAD_AGE_SECONDS
+) -> int:
+    """
+    Delete staged files abandoned by a crashed worker.
     
-    # If file exists, append a counter
-    counter = 1
-    while file_path.exists():
-        stem = file_path.stem
-        suffix = file_path.suffix
-        file_path = upload_dir / f"{stem}_{counter}{suffix}"
-        counter += 1
+    Args:
+        upload_dir: Directory files are staged in
+        max_age_seconds: Minimum age of a temporary file before it is removed
+        
+    Returns:
+        Number of files removed
+    """
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for path in upload_dir.glob(f"{UPLOAD_TEMP_PREFIX}*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            # Finished or cleaned up concurrently
+            continue
+    return removed
+
+
+def save_embedding(embedding: "np.ndarray", embedding_path: str) -> None:
+    """
+    Save a speaker embedding to disk in half precision.
     
-    file_path.write_bytes(file_content)
-    return str(file_path)
+    Args:
+        embedding: Speaker embedding vector
+        embedding_path: Destination .npy path
+    """
+    import numpy as np
+
+    np.save(embedding_path, embedding.astype(np.float16, copy=False))
+
+
+def load_embedding(embedding_path: str) -> "np.ndarray":
+    """
+    Load a speaker embedding saved by save_embedding.
+    
+    The file is memory-mapped read-only, so pages are shared through the
+    OS page cache instead of being copied per load.
+    
+    Args:
+        embedding_path: Path to the .npy file
+        
+    Returns:
+        Read-only float16 embedding array
+    """
+    import numpy as np
+
+    return np.load(embedding_path, mmap_mode="r")
 
 
 def validate_audio_file(content_type: str) -> bool:
@@ -38,23 +265,41 @@ def validate_audio_file(content_type: str) -> bool:
     Validate that the uploaded file is an audio file.
     
     Args:
-        content_type: MIME type of the file
+        content_type: MIME type of the file, optionally with parameters
+            (e.g. "audio/wav; codecs=1")
         
     Returns:
         True if valid audio type, False otherwise
     """
-    valid_types = {
-        "audio/wav",
-        "audio/wave",
-        "audio/x-wav",
-        "audio/mpeg",
-        "audio/mp3",
-        "audio/mp4",
-        "audio/x-m4a",
-        "audio/m4a",
-        "audio/ogg",
-        "audio/webm",
-        "audio/flac",
-    }
-    return content_type.lower() in valid_types
+    # Clients almost always send a bare lowercase type, so normalize only on a miss
+    if content_type in _AUDIO_MIME_TYPES:
+        return True
+    return content_type.split(";", 1)[0].strip().lower() in _AUDIO_MIME_TYPES
+
+
+def has_audio_signature(header: bytes) -> bool:
+    """
+    Check the leading bytes of a file against known audio container signatures.
+
+    Only the first AUDIO_SIGNATURE_SIZE bytes are inspected, so the cost does
+    not depend on file size.
+
+    Args:
+        header: First bytes of the file
 
+    Returns:
+        True if the bytes match wav, mp3, m4a/mp4, ogg, webm or flac
+    """
+    if len(header) < 12:
+        return False
+    # WAV: RIFF....WAVE
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return True
+    # MP3: ID3 tag or MPEG frame sync (11 set bits)
+    if header[:3] == b"ID3" or (header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return True
+    # M4A/MP4: ....ftyp
+    if header[4:8] == b"ftyp":
+        return True
+    # OGG, FLAC, WebM (Matroska EBML)
+    return header[:4] in (b"OggS", b"fLaC", b"\x1a\x45\xdf\xa3")